@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: run_details write throughput (rows/sec).
+
+Compares the previous per-row INSERT loop of fetch_market_data.save_to_db with
+the batched run_writer.insert_run. Every round runs inside a transaction that
+is rolled back, so nothing is persisted.
+
+Usage (from backend/):
+    DATABASE_URL=postgresql://... python benchmarks/bench_save_to_db.py [runs] [expiries_per_run]
+"""
+
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import text
+from src.infrastructure.database.session import engine
+from src.infrastructure.database.run_writer import insert_run
+
+
+def make_details(n_expiries, spot=50000.0):
+    today = date.today()
+    details = []
+    for i in range(n_expiries):
+        days = 1 + i * 7
+        fwd = spot * (1 + 0.0002 * days)
+        premium = (fwd / spot - 1) * 100
+        details.append({
+            "expiry_str": (today + timedelta(days=days)).strftime("%d %b %Y"),
+            "expiry_date": today + timedelta(days=days),
+            "days_to_expiry": days,
+            "future_price": fwd,
+            "open_interest": 1000.0,
+            "spot_price": spot,
+            "premium_pct": premium,
+            "annualized_pct": premium / (days / 365.25),
+            "curve": "Contango",
+            "instrument_name": f"BTC-BENCH{i}",
+        })
+    return details
+
+
+def per_row_insert(conn, symbol, spot, data):
+    # The previous save_to_db body: one round trip per expiry
+    run_id = conn.execute(
+        text("INSERT INTO crypto_forwards.run_main (asset, spot_price) VALUES (:asset, :spot) RETURNING run_main_id"),
+        {"asset": symbol, "spot": spot},
+    ).scalar()
+    for row in data:
+        conn.execute(
+            text("""
+                INSERT INTO crypto_forwards.run_details
+                (run_main_id, expiry_str, expiry_date, days_to_expiry, future_price, open_interest, spot_price, premium_pct, annualized_pct, curve, instrument_name)
+                VALUES (:run_id, :expiry_str, :expiry_date, :days, :fwd, :oi, :spot, :prem, :ann, :curve, :inst)
+            """),
+            {
+                "run_id": run_id, "expiry_str": row["expiry_str"], "expiry_date": row["expiry_date"],
+                "days": row["days_to_expiry"], "fwd": row["future_price"], "oi": row["open_interest"],
+                "spot": row["spot_price"], "prem": row["premium_pct"], "ann": row["annualized_pct"],
+                "curve": str(row["curve"]), "inst": row["instrument_name"],
+            },
+        )
+    return run_id
+
+
+def bench(writer, runs, details):
+    conn = engine.connect()
+    trans = conn.begin()
+    try:
+        start = time.perf_counter()
+        for _ in range(runs):
+            writer(conn, "BTC", 50000.0, details)
+        elapsed = time.perf_counter() - start
+    finally:
+        trans.rollback()
+        conn.close()
+    return runs * len(details) / elapsed
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    expiries = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    details = make_details(expiries)
+
+    before = bench(per_row_insert, runs, details)
+    after = bench(insert_run, runs, details)
+    print(f"{runs} runs x {expiries} expiries")
+    print(f"per-row INSERT : {before:10.0f} rows/sec")
+    print(f"batched insert : {after:10.0f} rows/sec  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Master Analysis Cache
+
+Per-symbol cache for the /analysis/{symbol}/master payload, versioned by the
+asset's latest run_main_id. New Deribit runs only arrive every few hours, so:
+
+    - same run_main_id      -> cached payload is returned as-is (one MAX() query)
+    - higher run_main_id    -> only the new runs are loaded and appended
+    - anything else         -> full rebuild (e.g. history deleted or out of order runs)
+
+Appending reuses the cached spot series and term-structure buckets (bucketing
+is per run, so old rows never change) and carries the expanding correlation
+sums forward. Rows whose forward return (f1/f5) is not final yet are kept out
+of the carried state and re-evaluated on every append.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.application.services.analysis_service import AnalysisService
+from src.application.services.correlation_engine import ExpandingCorrelation
+from src.application.services.term_structure import PREM_COLS
+
+# target column -> (forward horizon in runs, min_periods) as used by the master endpoint
+CORRELATION_TARGETS = {
+    "f1": (1, 4),
+    "f5": (5, 3),
+}
+
+
+@dataclass
+class MasterAnalysisEntry:
+    run_main_id: int
+    spot: pd.DataFrame
+    buckets: pd.DataFrame
+    correlations: Dict[str, ExpandingCorrelation] = field(default_factory=dict)
+    # Correlation rows already folded into the carried state, per target
+    final_correlations: Dict[str, np.ndarray] = field(default_factory=dict)
+    payload: Optional[dict] = None
+
+
+class MasterAnalysisCache:
+    def __init__(self):
+        self._entries: Dict[str, MasterAnalysisEntry] = {}
+        # One lock per symbol so BTC and ETH can refresh concurrently on the worker pool
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def get(self, symbol: str) -> Optional[dict]:
+        latest_id = AnalysisService.get_latest_run_id(symbol)
+        if latest_id is None:
+            return None
+
+        with self._lock_for(symbol):
+            entry = self._entries.get(symbol)
+            if entry is not None and entry.run_main_id == latest_id:
+                return entry.payload
+
+            if entry is not None and latest_id > entry.run_main_id:
+                entry = self._append(entry, symbol)
+            else:
+                entry = self._build(symbol)
+
+            if entry is None:
+                self._entries.pop(symbol, None)
+                return None
+
+            self._entries[symbol] = entry
+            return entry.payload
+
+    def invalidate(self, symbol: str = None):
+        with self._locks_guard:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    def _build(self, symbol: str) -> Optional[MasterAnalysisEntry]:
+        df = AnalysisService.get_analysis_data(symbol)
+        if df.empty:
+            return None
+
+        entry = MasterAnalysisEntry(
+            run_main_id=int(df["run_main_id"].max()),
+            spot=AnalysisService.get_spot_prices(df),
+            buckets=AnalysisService.get_term_structure(df),
+        )
+        return self._refresh(entry)
+
+    def _append(self, entry: MasterAnalysisEntry, symbol: str) -> Optional[MasterAnalysisEntry]:
+        df = AnalysisService.get_analysis_data(symbol, after_run_id=entry.run_main_id)
+        if df.empty:
+            # A run without details (or a failed read): nothing to add
+            return entry
+
+        # Appending only works for runs strictly after the cached history
+        if df["ran_at_utc"].min() <= entry.spot["ran_at_utc"].max():
+            return self._build(symbol)
+
+        entry.run_main_id = int(df["run_main_id"].max())
+        entry.spot = pd.concat([entry.spot, AnalysisService.get_spot_prices(df)], ignore_index=True)
+        entry.buckets = pd.concat([entry.buckets, AnalysisService.get_term_structure(df)], ignore_index=True)
+        return self._refresh(entry)
+
+    def _refresh(self, entry: MasterAnalysisEntry) -> MasterAnalysisEntry:
+        """Recomputes the payload from the cached series, carrying correlation state forward."""
+        spot_df = entry.spot.rename(columns={"spot": "spot_run"})
+        buckets = entry.buckets
+
+        days = AnalysisService.get_days_to_expiry(spot_df, buckets=buckets)
+        prems = AnalysisService.get_annualized_forward_premiums(spot_df, buckets=buckets)
+        # Medians move with every new run, so deviations are re-derived (vectorized, O(n))
+        devs = AnalysisService.get_forward_premiums_vs_sample_median(spot_df, buckets=buckets)
+        chgs = AnalysisService.get_forward_price_changes(spot_df)
+
+        merged = prems.merge(chgs, on="ran_at_utc", how="inner").sort_values("ran_at_utc").reset_index(drop=True)
+        x = merged[PREM_COLS].to_numpy(dtype=float)
+
+        corr_frames = {}
+        for target, (horizon, min_periods) in CORRELATION_TARGETS.items():
+            y = merged[target].to_numpy(dtype=float)
+            state = entry.correlations.get(target)
+            if state is None:
+                state = ExpandingCorrelation.for_data(x, y, min_periods)
+                entry.correlations[target] = state
+                entry.final_correlations[target] = np.empty((0, len(PREM_COLS)))
+
+            # Rows more than `horizon` runs from the end have a final forward return
+            final_rows = max(state.rows, len(merged) - horizon)
+            newly_final = state.update(x[state.rows:final_rows], y[state.rows:final_rows])
+            entry.final_correlations[target] = np.vstack([entry.final_correlations[target], newly_final])
+            tail = state.peek(x[final_rows:], y[final_rows:])
+
+            corrs = np.vstack([entry.final_correlations[target], tail])
+            frame = merged[["ran_at_utc"]].copy()
+            for j, col in enumerate(PREM_COLS):
+                frame[col] = corrs[:, j]
+            corr_frames[target] = frame
+
+        entry.payload = AnalysisService.to_master_payload(
+            entry.spot, days, prems, devs, chgs, corr_frames["f1"], corr_frames["f5"]
+        )
+        return entry
+
+
+master_analysis_cache = MasterAnalysisCache()
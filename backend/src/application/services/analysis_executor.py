@@ -0,0 +1,91 @@
+"""
+Analysis Executor
+
+Runs blocking analysis work (SQLAlchemy reads + pandas/NumPy) on a bounded
+thread pool so it never blocks the uvicorn event loop, and coalesces
+concurrent requests per key: N simultaneous requests for BTC share one
+computation and all receive its result.
+
+A thread pool (not a process pool) is used on purpose: the master analysis
+cache lives in this process, and the heavy NumPy/pandas kernels and DB I/O
+release the GIL for most of their runtime.
+
+Configuration (environment):
+    ANALYSIS_MAX_WORKERS  - concurrent computations (default 2)
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+
+
+class AnalysisExecutor:
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        # key -> shared asyncio future (only touched from the event loop thread)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._coalesced = 0
+
+    async def run(self, key: Hashable, fn: Callable[..., Any], *args) -> Any:
+        """
+        Runs fn(*args) on the pool, or joins the computation already in flight for `key`.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self._coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            with self._lock:
+                self._submitted += 1
+            future = loop.run_in_executor(self._pool, self._call, fn, args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _f, k=key: self._inflight.pop(k, None))
+
+        # A cancelled request (client went away) must not cancel the shared computation
+        return await asyncio.shield(future)
+
+    def _call(self, fn: Callable[..., Any], args) -> Any:
+        with self._lock:
+            self._active += 1
+        try:
+            result = fn(*args)
+            with self._lock:
+                self._completed += 1
+            return result
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            active = self._active
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "active": active,
+                # Submitted to the pool but waiting for a free worker
+                "queued": self._submitted - finished - active,
+                "inflight_keys": len(self._inflight),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "coalesced": self._coalesced,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+analysis_executor = AnalysisExecutor(max_workers=int(os.getenv("ANALYSIS_MAX_WORKERS", "2")))
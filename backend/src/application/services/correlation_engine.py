@@ -0,0 +1,154 @@
+"""
+Correlation Engine
+
+Vectorized Pearson correlations of several columns against one target series,
+computed from NaN-aware cumulative sums (Σx, Σy, Σxy, Σx², Σy² and pair counts).
+
+Both modes of the original per-row loop are supported in a single pass:
+    - expanding (window=None): row i uses rows 0..i
+    - rolling (window=N):      row i uses rows i-N+1..i
+
+A value is emitted only when the slice holds at least `min_periods` valid
+(x, y) pairs and both series have non-zero variance, which mirrors
+`data.dropna()` + `len(data) >= min_periods` + `Series.corr` returning NaN.
+"""
+
+import warnings
+from typing import Optional
+import numpy as np
+
+# Moment layout along the last axis of the cumulative sums array
+N, SX, SY, SXX, SYY, SXY = range(6)
+
+# Relative tolerance below which a variance is treated as zero (constant slice)
+ZERO_VARIANCE_RTOL = 1e-10
+
+
+def centring_refs(x: np.ndarray, y: np.ndarray):
+    """Column and target means used to centre values (0 where a column is all NaN)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        x_ref = np.nanmean(x, axis=0) if len(x) else np.zeros(x.shape[1])
+        y_ref = np.nanmean(y) if len(y) else 0.0
+
+    x_ref = np.where(np.isnan(x_ref), 0.0, x_ref)
+    y_ref = 0.0 if np.isnan(y_ref) else float(y_ref)
+    return x_ref, y_ref
+
+
+def cumulative_moments(x: np.ndarray, y: np.ndarray, x_ref: np.ndarray = None, y_ref: float = None) -> np.ndarray:
+    """
+    Returns an array of shape (n + 1, k, 6) holding the running pair count and
+    sums for each of the k columns of `x` against `y`. Row 0 is all zeros so
+    that the sums over rows [a, b) are simply `moments[b] - moments[a]`.
+
+    Values are centred on the column/target means before accumulating. The
+    correlation is shift invariant, and centring keeps the Σx² - (Σx)²/n
+    differences well conditioned for long histories. Pass explicit refs to
+    keep sums from separate batches additive.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+
+    if x_ref is None or y_ref is None:
+        x_ref, y_ref = centring_refs(x, y)
+
+    valid = ~np.isnan(x) & ~np.isnan(y)[:, None]
+    xc = np.where(valid, x - x_ref, 0.0)
+    yc = np.where(valid, y[:, None] - y_ref, 0.0)
+
+    stacked = np.stack([valid.astype(float), xc, yc, xc * xc, yc * yc, xc * yc], axis=-1)
+    moments = np.zeros((stacked.shape[0] + 1,) + stacked.shape[1:])
+    np.cumsum(stacked, axis=0, out=moments[1:])
+    return moments
+
+
+def correlations_from_sums(sums: np.ndarray, min_periods: int) -> np.ndarray:
+    """
+    Converts per-slice sums (..., 6) into Pearson correlations (...).
+    Slices with fewer than `min_periods` pairs or a zero variance give NaN.
+    """
+    n = sums[..., N]
+    sx, sy = sums[..., SX], sums[..., SY]
+    sxx, syy, sxy = sums[..., SXX], sums[..., SYY], sums[..., SXY]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        cov = sxy - sx * sy / n
+
+        flat = (var_x <= ZERO_VARIANCE_RTOL * sxx) | (var_y <= ZERO_VARIANCE_RTOL * syy)
+        corr = cov / np.sqrt(var_x * var_y)
+
+    # Guard against tiny overshoots from floating point cancellation
+    corr = np.clip(corr, -1.0, 1.0)
+    corr[(n < max(min_periods, 2)) | flat] = np.nan
+    return corr
+
+
+def rolling_correlations(
+    x: np.ndarray,
+    y: np.ndarray,
+    window: Optional[int] = None,
+    min_periods: int = 4,
+) -> np.ndarray:
+    """
+    Expanding (window=None) or fixed-window correlation of every column of `x`
+    against `y`. Returns an (n, k) float array with NaN where undefined.
+    """
+    moments = cumulative_moments(x, y)
+    n_rows = moments.shape[0] - 1
+    if n_rows == 0:
+        return np.empty((0, moments.shape[1]))
+
+    end = np.arange(1, n_rows + 1)
+    if window is None:
+        sums = moments[end]
+    else:
+        start = np.maximum(0, end - window)
+        sums = moments[end] - moments[start]
+
+    return correlations_from_sums(sums, min_periods)
+
+
+class ExpandingCorrelation:
+    """
+    Expanding-window correlation whose sums are carried forward between calls,
+    so appending rows costs O(new rows) instead of a pass over the history.
+
+    `update` folds rows into the state permanently; `peek` evaluates rows on
+    top of the state without keeping them (for provisional tail rows whose
+    inputs may still change).
+    """
+
+    def __init__(self, x_ref: np.ndarray, y_ref: float, min_periods: int):
+        self.x_ref = np.asarray(x_ref, dtype=float)
+        self.y_ref = y_ref
+        self.min_periods = min_periods
+        self.sums = np.zeros((len(self.x_ref), 6))
+        self.rows = 0
+
+    @classmethod
+    def for_data(cls, x: np.ndarray, y: np.ndarray, min_periods: int) -> "ExpandingCorrelation":
+        x_ref, y_ref = centring_refs(x, y)
+        return cls(x_ref, y_ref, min_periods)
+
+    def _moments(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return cumulative_moments(x, y, self.x_ref, self.y_ref)[1:] + self.sums
+
+    def update(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        moments = self._moments(x, y)
+        if len(moments):
+            self.sums = moments[-1]
+            self.rows += len(moments)
+        return correlations_from_sums(moments, self.min_periods)
+
+    def peek(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return correlations_from_sums(self._moments(x, y), self.min_periods)
@@ -0,0 +1,106 @@
+"""
+Term Structure Bucketing
+
+Maps every run's expiries onto the fixed tenor buckets used across the
+analysis (t_1 ... t_360 / prem1 ... prem360) in a single pass.
+
+Logic (same as the presenter script):
+    - Anchor (t_270): expiry closest to 270 days, ties resolved to the shorter one
+    - Below the anchor, ranked by days descending: rank 1..6 -> t_180, t_90, t_60, t_30, t_7, t_1
+    - Above the anchor, ranked by days ascending:  rank 1    -> t_360
+
+Runs are keyed by ran_at_utc. All detail rows are sorted once by
+(ran_at_utc, days_to_expiry) and ranks are assigned with NumPy offsets
+relative to each run's anchor, instead of a sort/groupby/cumcount per side.
+"""
+
+import numpy as np
+import pandas as pd
+
+ANCHOR_DAYS = 270
+
+# (bucket suffix, side, rank) - order matches the API column order
+BUCKETS = [
+    ("1", "below", 6),
+    ("7", "below", 5),
+    ("30", "below", 4),
+    ("60", "below", 3),
+    ("90", "below", 2),
+    ("180", "below", 1),
+    ("270", "anchor", 1),
+    ("360", "above", 1),
+]
+
+DAYS_COLS = [f"t_{b}" for b, _, _ in BUCKETS]
+PREM_COLS = [f"prem{b}" for b, _, _ in BUCKETS]
+DEV_COLS = [f"dev_{b}" for b, _, _ in BUCKETS]
+
+
+def bucket_term_structure(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns one row per ran_at_utc (ascending) with every t_* (days to expiry)
+    and prem* (annualized premium) bucket column. Buckets a run cannot fill
+    are NaN.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=["ran_at_utc"] + DAYS_COLS + PREM_COLS)
+
+    codes, run_times = pd.factorize(df["ran_at_utc"], sort=True)
+    days = df["days_to_expiry"].to_numpy()
+    premiums = df["annualized_pct"].to_numpy(dtype=float)
+    n_runs = len(run_times)
+
+    # The single sort: by run, then days ascending (stable on original order)
+    order = np.lexsort((days, codes))
+    g = codes[order]
+    d = days[order]
+    p = premiums[order]
+
+    starts = np.searchsorted(g, np.arange(n_runs))
+
+    # Anchor: first row (shortest expiry) holding the run's minimum distance to 270
+    dist = np.abs(d - ANCHOR_DAYS)
+    min_dist = np.minimum.reduceat(dist, starts)
+    is_min = dist == min_dist[g]
+    anchor_pos = np.full(n_runs, len(d))
+    np.minimum.at(anchor_pos, g[is_min], np.flatnonzero(is_min))
+    anchor_days = d[anchor_pos]
+
+    # Within a run rows are sorted by days, so below/above ranks are offsets
+    below = d < anchor_days[g]
+    above = d > anchor_days[g]
+    n_below = np.bincount(g, weights=below, minlength=n_runs).astype(int)
+    n_not_above = np.bincount(g, weights=~above, minlength=n_runs).astype(int)
+
+    pos = np.arange(len(d))
+    above_rank = pos - (starts[g] + n_not_above[g]) + 1
+
+    # Below ranks run in descending days. Rows sharing the same days keep their
+    # original order (as the stable pandas sort did), so rank within tie blocks.
+    new_block = np.ones(len(d), dtype=bool)
+    new_block[1:] = (g[1:] != g[:-1]) | (d[1:] != d[:-1])
+    block_start = np.maximum.accumulate(np.where(new_block, pos, 0))
+    block_end = np.append(np.flatnonzero(new_block)[1:], len(d))[np.cumsum(new_block) - 1]
+    below_rank = starts[g] + n_below[g] - block_end + (pos - block_start) + 1
+
+    out = {"ran_at_utc": run_times}
+    days_out = {}
+    prem_out = {}
+    for bucket, side, rank in BUCKETS:
+        t_col = np.full(n_runs, np.nan)
+        prem_col = np.full(n_runs, np.nan)
+        if side == "anchor":
+            t_col[:] = anchor_days
+            prem_col[:] = p[anchor_pos]
+        else:
+            mask = (below & (below_rank == rank)) if side == "below" else (above & (above_rank == rank))
+            t_col[g[mask]] = d[mask]
+            prem_col[g[mask]] = p[mask]
+
+        # Keep whole-day integers when every run fills the bucket (as the old joins did)
+        days_out[f"t_{bucket}"] = t_col.astype(days.dtype) if not np.isnan(t_col).any() else t_col
+        prem_out[f"prem{bucket}"] = prem_col
+
+    out.update(days_out)
+    out.update(prem_out)
+    return pd.DataFrame(out)
@@ -0,0 +1,90 @@
+"""
+Columnar Loader
+
+Loads a query result straight into typed NumPy columns (as a DataFrame)
+without building one Python tuple of Decimal objects per row.
+
+    - psycopg2 (production): COPY (<query>) TO STDOUT WITH (FORMAT csv), parsed
+      by the pandas C reader with fixed dtypes.
+    - any other driver: server-side cursor (stream_results) read in chunks,
+      each chunk converted to typed arrays and concatenated once at the end.
+
+Queries should cast NUMERIC columns to float8 so no Decimal is ever created.
+"""
+
+import io
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+CHUNK_SIZE = 50_000
+
+
+def load_columns(engine, query: str, params: Dict, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """
+    Runs `query` and returns a DataFrame with exactly the columns in `dtypes`
+    (in that order), typed accordingly.
+    """
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if hasattr(cursor, "copy_expert") and hasattr(cursor, "mogrify"):
+            try:
+                return _load_via_copy(cursor, query, params, dtypes)
+            finally:
+                cursor.close()
+        cursor.close()
+    finally:
+        raw.close()
+
+    return _load_via_stream(engine, query, params, dtypes)
+
+
+def _load_via_copy(cursor, query: str, params: Dict, dtypes: Dict[str, str]) -> pd.DataFrame:
+    # COPY cannot take bind parameters, so the driver renders them safely first.
+    # psycopg2 uses %(name)s placeholders where SQLAlchemy text() uses :name.
+    sql = query.strip().rstrip(";")
+    for name in sorted(params, key=len, reverse=True):
+        sql = sql.replace(f":{name}", f"%({name})s")
+    rendered = cursor.mogrify(sql, params).decode()
+
+    buffer = io.BytesIO()
+    cursor.copy_expert(f"COPY ({rendered}) TO STDOUT WITH (FORMAT csv)", buffer)
+    buffer.seek(0)
+
+    if buffer.getbuffer().nbytes == 0:
+        return _empty_frame(dtypes)
+
+    return pd.read_csv(
+        buffer,
+        header=None,
+        names=list(dtypes),
+        dtype=dtypes,
+        engine="c",
+    )
+
+
+def _load_via_stream(engine, query: str, params: Dict, dtypes: Dict[str, str]) -> pd.DataFrame:
+    chunks = {name: [] for name in dtypes}
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(text(query), params)
+        for rows in result.partitions(CHUNK_SIZE):
+            columns = list(zip(*rows))
+            for name, values in zip(dtypes, columns):
+                chunks[name].append(np.asarray(values, dtype=_numpy_dtype(dtypes[name])))
+
+    if not chunks or not next(iter(chunks.values())):
+        return _empty_frame(dtypes)
+
+    return pd.DataFrame({name: np.concatenate(parts) for name, parts in chunks.items()})
+
+
+def _numpy_dtype(dtype: str):
+    # Nullable floats arrive as None from the driver
+    return float if dtype.startswith("float") else dtype
+
+
+def _empty_frame(dtypes: Dict[str, str]) -> pd.DataFrame:
+    return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in dtypes.items()})
@@ -0,0 +1,65 @@
+"""
+Run Writer
+
+Batched write path for one crypto_forwards run: a single INSERT ... RETURNING
+for run_main, then every run_details row in one multi-row INSERT (SQLAlchemy
+Core executemany, which psycopg2 turns into batched VALUES lists) instead of
+one round trip per expiry.
+
+The caller owns the transaction: pass a Connection from `engine.begin()` or
+`session.connection()` so the run is stored all-or-nothing.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Connection
+
+from src.infrastructure.database.models import RunMain, RunDetails
+
+DETAIL_FIELDS = [
+    "expiry_str",
+    "expiry_date",
+    "days_to_expiry",
+    "future_price",
+    "open_interest",
+    "spot_price",
+    "premium_pct",
+    "annualized_pct",
+    "curve",
+    "instrument_name",
+]
+
+
+def insert_run(
+    conn: Connection,
+    asset: str,
+    spot: float,
+    details: List[Dict[str, Any]],
+    source: Optional[str] = None,
+) -> int:
+    """
+    Inserts a run_main row and all its run_details rows, returning run_main_id.
+    `details` are dicts keyed like the run_details columns (see DETAIL_FIELDS).
+    """
+    main_values = {"asset": str(asset), "spot_price": spot}
+    if source is not None:
+        main_values["source"] = source
+
+    run_id = conn.execute(
+        insert(RunMain.__table__).values(**main_values).returning(RunMain.__table__.c.run_main_id)
+    ).scalar_one()
+
+    if details:
+        rows = [
+            {"run_main_id": run_id, **{name: _plain(row.get(name)) for name in DETAIL_FIELDS}}
+            for row in details
+        ]
+        conn.execute(insert(RunDetails.__table__), rows)
+
+    return run_id
+
+
+def _plain(value):
+    # Enum members (CurveShape) are stored by name; plain strings pass through
+    return value.value if hasattr(value, "value") else value
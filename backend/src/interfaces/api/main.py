@@ -41,6 +41,11 @@ def on_startup():
     except Exception as e:
         print(f"API Startup - CRITICAL ERROR: {e}")
 
+@app.on_event("shutdown")
+def on_shutdown():
+    from src.application.services.analysis_executor import analysis_executor
+    analysis_executor.shutdown()
+
 # Trust Proxy Headers (Critical for EasyPanel/SSL Termination)
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=["*"])
 
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
-from src.application.services.analysis_service import AnalysisService
+from src.application.services.analysis_cache import master_analysis_cache
+from src.application.services.analysis_executor import analysis_executor
 
 router = APIRouter(
     prefix="/analysis",
@@ -8,7 +9,9 @@ router = APIRouter(
 
 @router.get("/{symbol}/master")
 async def get_master_analysis(symbol: str):
-    data = AnalysisService.get_master_analysis(symbol)
+    # Cached per symbol; recomputed only when a newer run_main_id exists.
+    # Runs on the analysis worker pool, concurrent requests per symbol share one computation.
+    data = await analysis_executor.run(("master", symbol), master_analysis_cache.get, symbol)
     if not data:
         raise HTTPException(status_code=404, detail=f"No analysis data found for {symbol}")
     return data
@@ -78,6 +78,12 @@ async def trigger_fetch(symbol: str):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@router.get("/analysis/executor")
+async def get_analysis_executor_metrics():
+    """Worker pool usage and queue depth for the analysis endpoints."""
+    from src.application.services.analysis_executor import analysis_executor
+    return analysis_executor.metrics()
+
 @router.get("/logs/scheduler")
 async def get_scheduler_logs():
     return read_logs("logs/scheduler.log")
@@ -5,7 +5,8 @@ from datetime import datetime
 from src.infrastructure.database.session import SessionLocal
 from src.infrastructure.database.scraping_models import WebScrape
 from src.infrastructure.database.silver_models import SilverTicker
-from src.infrastructure.database.models import RunMain, RunDetails, CryptoAssetSymbol, CurveShape
+from src.infrastructure.database.models import CryptoAssetSymbol, CurveShape
+from src.infrastructure.database.run_writer import insert_run
 from sqlalchemy import desc
 
 class DeribitPipeline:
@@ -124,17 +125,9 @@ class DeribitPipeline:
         if not futures:
             return
 
-        # Create Main Run
-        run_main = RunMain(
-            asset=CryptoAssetSymbol(symbol),
-            source="deribit_pipeline",
-            spot_price=spot_price
-        )
-        self.db.add(run_main)
-        self.db.flush() # Get ID
-
         # Calculate Logic
         today_date = datetime.now().date()
+        details = []
         
         for f in futures:
             try:
@@ -155,21 +148,28 @@ class DeribitPipeline:
                  if premium_pct < -0.1: curve = CurveShape.Backwardation
                  elif premium_pct <= 0.1: curve = CurveShape.Flat
 
-                 detail = RunDetails(
-                     run_main_id=run_main.run_main_id,
-                     expiry_str=expiry_date.strftime("%d %b %Y"),
-                     expiry_date=expiry_date,
-                     days_to_expiry=days,
-                     future_price=f.price,
-                     open_interest=0, # Not in SilverTicker yet
-                     spot_price=spot_price,
-                     premium_pct=premium_pct,
-                     annualized_pct=ann_pct,
-                     curve=curve,
-                     instrument_name=f.instrument_name
-                 )
-                 self.db.add(detail)
+                 details.append({
+                     "expiry_str": expiry_date.strftime("%d %b %Y"),
+                     "expiry_date": expiry_date,
+                     "days_to_expiry": days,
+                     "future_price": f.price,
+                     "open_interest": 0, # Not in SilverTicker yet
+                     "spot_price": spot_price,
+                     "premium_pct": premium_pct,
+                     "annualized_pct": ann_pct,
+                     "curve": curve,
+                     "instrument_name": f.instrument_name
+                 })
             except Exception as e:
                 self.logger.error(f"Error calc gold for {f.instrument_name}: {e}")
 
-        self.logger.info(f"Silver->Gold: Generated Run {run_main.run_main_id} for {symbol}")
+        # Main run + all details in one batched write, inside the pipeline's transaction
+        run_main_id = insert_run(
+            self.db.connection(),
+            CryptoAssetSymbol(symbol).value,
+            spot_price,
+            details,
+            source="deribit_pipeline",
+        )
+
+        self.logger.info(f"Silver->Gold: Generated Run {run_main_id} for {symbol}")
@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Allows bursts of up to `capacity` requests and a sustained `rate` requests
+    per second. `acquire()` blocks until a token is available, so it can be
+    shared by every worker thread that talks to the same API.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                else:
+                    self._refill(now)
+                    # Small tolerance so float rounding in the refill can't stall a caller
+                    if self._tokens >= tokens - 1e-9:
+                        self._tokens = max(0.0, self._tokens - tokens)
+                        return
+                    wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def pause(self, seconds: float):
+        """Blocks every caller for `seconds` (e.g. after an HTTP 429 with Retry-After)."""
+        with self._lock:
+            now = self._clock()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            # Start from an empty bucket once the pause is over
+            self._tokens = 0.0
+            self._updated = self._blocked_until
@@ -2,8 +2,14 @@ import requests
 import time
 import logging
 import os
+import sys
+# Allow running as a standalone script (python src/scripts/fetch_market_data.py)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 from sqlalchemy import create_engine, text
+from src.scrapers.rate_limiter import TokenBucket
 
 # Setup Logging
 log_dir = "logs"
@@ -24,12 +30,27 @@ if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 engine = create_engine(DATABASE_URL)
 
+# HTTP Config
+# Max ticker requests in flight (shared by all assets) and Deribit request budget per second
+DERIBIT_MAX_CONCURRENCY = int(os.getenv("DERIBIT_MAX_CONCURRENCY", "8"))
+DERIBIT_RATE_LIMIT = float(os.getenv("DERIBIT_RATE_LIMIT", "20"))
+
+# One pooled keep-alive session for every Deribit call
+http = requests.Session()
+http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=DERIBIT_MAX_CONCURRENCY + 2))
+rate_limiter = TokenBucket(rate=DERIBIT_RATE_LIMIT)
+ticker_pool = ThreadPoolExecutor(max_workers=DERIBIT_MAX_CONCURRENCY, thread_name_prefix="deribit")
+
+def http_get(url, timeout):
+    rate_limiter.acquire()
+    return http.get(url, timeout=timeout)
+
 def get_perp_price(symbol):
     # Deribit uses BTC-PERPETUAL / ETH-PERPETUAL
     instrument = f"{symbol}-PERPETUAL"
     url = f"https://www.deribit.com/api/v2/public/ticker?instrument_name={instrument}"
     try:
-        r = requests.get(url, timeout=10)
+        r = http_get(url, timeout=10)
         return float(r.json()["result"]["mark_price"])
     except Exception as e:
         logger.error(f"Error fetching spot for {symbol}: {e}")
@@ -38,7 +59,7 @@ def get_perp_price(symbol):
 def get_futures_instruments(currency):
     url = f"https://www.deribit.com/api/v2/public/get_instruments?currency={currency}&kind=future&expired=false"
     try:
-        r = requests.get(url, timeout=15)
+        r = http_get(url, timeout=15)
         r.raise_for_status()
         return r.json().get("result", [])
     except Exception as e:
@@ -48,7 +69,7 @@ def get_futures_instruments(currency):
 def get_ticker_data(instrument_name):
     url = f"https://www.deribit.com/api/v2/public/ticker?instrument_name={instrument_name}"
     try:
-        r = requests.get(url, timeout=10)
+        r = http_get(url, timeout=10)
         r.raise_for_status()
         result = r.json().get("result", {})
         return {
@@ -76,8 +97,8 @@ def process_asset(symbol):
 
     logger.info(f"Found {len(instruments)} futures for {symbol}. Fetching details...")
 
-    # 3. Filter and Process
-    valid_data = []
+    # 3. Filter
+    targets = []
     today_date = datetime.now().date()
 
     for inst in instruments:
@@ -96,7 +117,18 @@ def process_asset(symbol):
             if days < 1:
                 continue
 
-            ticker = get_ticker_data(name)
+            targets.append((name, expiry, days))
+        except Exception as e:
+            logger.error(f"Error processing {name}: {e}")
+
+    # 4. Fetch all tickers concurrently (bounded pool + rate limiter) so the
+    # snapshot is captured in a tight time window
+    tickers = list(ticker_pool.map(get_ticker_data, [name for name, _, _ in targets]))
+
+    # 5. Process
+    valid_data = []
+    for (name, expiry, days), ticker in zip(targets, tickers):
+        try:
             if not ticker or ticker["mark_price"] == 0:
                 continue
 
@@ -122,7 +154,6 @@ def process_asset(symbol):
                 "curve": curve_shape,
                 "instrument_name": name
             })
-            time.sleep(0.05) # Rate limit kindness
 
         except Exception as e:
             logger.error(f"Error processing {name}: {e}")
@@ -131,55 +162,31 @@ def process_asset(symbol):
         logger.info(f"No valid future data collected for {symbol}.")
         return
 
-    # 4. Save to DB
+    # 6. Save to DB
     save_to_db(symbol, spot, valid_data)
     logger.info(f"Successfully processed {len(valid_data)} records for {symbol}.")
 
 def save_to_db(symbol, spot, data):
+    # One INSERT ... RETURNING for run_main plus one batched INSERT for all details,
+    # inside a single transaction (all-or-nothing).
+    from src.infrastructure.database.run_writer import insert_run
     try:
         logger.info(f"DEBUG: Saving to DB. URL starts with: {DATABASE_URL[:20]}...")
         with engine.begin() as conn:
-            # Insert Main Run
-            result = conn.execute(
-                text("""
-                    INSERT INTO crypto_forwards.run_main (asset, spot_price)
-                    VALUES (:asset, :spot)
-                    RETURNING run_main_id
-                """),
-                {"asset": symbol, "spot": spot}
-            )
-            run_id = result.scalar()
-
-            # Insert Details
-            for row in data:
-                conn.execute(
-                    text("""
-                        INSERT INTO crypto_forwards.run_details 
-                        (run_main_id, expiry_str, expiry_date, days_to_expiry, future_price, open_interest, spot_price, premium_pct, annualized_pct, curve, instrument_name)
-                        VALUES (:run_id, :expiry_str, :expiry_date, :days, :fwd, :oi, :spot, :prem, :ann, :curve, :inst)
-                    """),
-                    {
-                        "run_id": run_id,
-                        "expiry_str": row["expiry_str"],
-                        "expiry_date": row["expiry_date"],
-                        "days": row["days_to_expiry"],
-                        "fwd": row["future_price"],
-                        "oi": row["open_interest"],
-                        "spot": row["spot_price"],
-                        "prem": row["premium_pct"],
-                        "ann": row["annualized_pct"],
-                        "curve": str(row["curve"]),
-                        "inst": row["instrument_name"]
-                    }
-                )
+            insert_run(conn, symbol, spot, data)
     except Exception as e:
         logger.error(f"Database Error for {symbol}: {e}")
         raise
 
 def main():
     logger.info("Starting Daily Market Data Fetch Job")
-    process_asset('BTC')
-    process_asset('ETH')
+    # Assets run in parallel; their ticker requests share the pool and rate limiter
+    symbols = ['BTC', 'ETH']
+    with ThreadPoolExecutor(max_workers=len(symbols)) as pool:
+        futures = [pool.submit(process_asset, symbol) for symbol in symbols]
+        errors = [f.exception() for f in futures if f.exception()]
+    if errors:
+        raise errors[0]
     logger.info("Job Complete")
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+import ast
+from pathlib import Path
+
+import pytest
+import pandas as pd
+import numpy as np
+
+PRESENTER_PATH = Path(__file__).resolve().parents[1] / "example_data" / "presenter_assets_data_analisys_to_excel.py"
+
+
+def load_presenter():
+    # The presenter script connects to a DB and runs main() at import time,
+    # so only its function definitions are compiled here.
+    tree = ast.parse(PRESENTER_PATH.read_text(encoding="utf-8"))
+    funcs = [node for node in tree.body if isinstance(node, ast.FunctionDef)]
+    namespace = {"pd": pd, "np": np}
+    exec(compile(ast.Module(body=funcs, type_ignores=[]), str(PRESENTER_PATH), "exec"), namespace)
+    return namespace
+
+
+def make_raw_data(n_runs=60, seed=7):
+    # Premiums are pre-rounded to 2 decimals because the presenter rounds them
+    # before correlating; some runs miss the short expiries to exercise NaN pairs.
+    rng = np.random.default_rng(seed)
+    rows = []
+    detail_id = 1
+    spot = 100.0
+    for i in range(n_runs):
+        ran_at = pd.Timestamp("2024-01-01") + pd.Timedelta(hours=3 * i)
+        spot *= float(np.exp(rng.normal(0, 0.02)))
+        days_list = [2, 9, 30, 58, 93, 180, 272, 365]
+        if i % 7 == 3:
+            days_list = days_list[2:]
+        for days in days_list:
+            rows.append({
+                "run_main_id": i + 1,
+                "asset": "BTC",
+                "ran_at_utc": ran_at,
+                "spot_run": round(spot, 2),
+                "detail_id": detail_id,
+                "days_to_expiry": days,
+                "annualized_pct": round(float(rng.normal(8, 3)), 2),
+            })
+            detail_id += 1
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope="session")
+def presenter():
+    return load_presenter()
+
+
+@pytest.fixture(name="make_raw_data")
+def make_raw_data_fixture():
+    return make_raw_data
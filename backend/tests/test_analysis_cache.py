@@ -0,0 +1,79 @@
+import pytest
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+from src.application.services.analysis_service import AnalysisService
+from src.application.services.analysis_cache import MasterAnalysisCache
+
+
+class FakeRunStore:
+    """Stands in for run_main/run_details: serves a growing prefix of a history."""
+
+    def __init__(self, df):
+        self.df = df
+        self.visible_runs = 0
+        self.reads = []
+
+    def latest_run_id(self, symbol):
+        return self.visible_runs or None
+
+    def raw_data(self, symbol, after_run_id=None):
+        self.reads.append(after_run_id)
+        visible = self.df[self.df["run_main_id"] <= self.visible_runs]
+        if after_run_id is not None:
+            visible = visible[visible["run_main_id"] > after_run_id]
+        return visible.reset_index(drop=True)
+
+
+@pytest.fixture
+def store(make_raw_data):
+    store = FakeRunStore(make_raw_data(n_runs=50, seed=3))
+    with patch.object(AnalysisService, "get_latest_run_id", side_effect=store.latest_run_id), \
+         patch.object(AnalysisService, "get_analysis_data", side_effect=store.raw_data):
+        yield store
+
+
+def assert_payload_close(actual, expected):
+    assert actual.keys() == expected.keys()
+    for section in expected:
+        a = pd.DataFrame(actual[section])
+        e = pd.DataFrame(expected[section])
+        assert list(a.columns) == list(e.columns), section
+        assert len(a) == len(e), section
+        for col in e.columns:
+            if col == "ran_at_utc":
+                assert (a[col] == e[col]).all()
+            else:
+                np.testing.assert_allclose(a[col].to_numpy(dtype=float), e[col].to_numpy(dtype=float),
+                                           rtol=1e-9, atol=1e-12, equal_nan=True, err_msg=f"{section}.{col}")
+
+
+def test_repeat_request_is_served_from_cache(store):
+    cache = MasterAnalysisCache()
+    store.visible_runs = 20
+
+    first = cache.get("BTC")
+    second = cache.get("BTC")
+
+    assert second is first
+    assert store.reads == [None]
+
+
+def test_appended_runs_match_full_recompute(store):
+    cache = MasterAnalysisCache()
+    cache_reads = []
+    for visible in [3, 8, 9, 20, 21, 50]:
+        store.visible_runs = visible
+        payload = cache.get("BTC")
+        cache_reads.append(store.reads[-1])
+
+        expected = AnalysisService.get_master_analysis("BTC")
+        assert_payload_close(payload, expected)
+
+    # One full load, then only the runs after the cached id
+    assert cache_reads == [None, 3, 8, 9, 20, 21]
+
+
+def test_no_runs_returns_none(store):
+    cache = MasterAnalysisCache()
+    assert cache.get("BTC") is None
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from src.application.services.analysis_executor import AnalysisExecutor
+
+
+def test_concurrent_requests_for_same_key_share_one_computation():
+    executor = AnalysisExecutor(max_workers=2)
+    calls = []
+
+    def compute(symbol):
+        calls.append(symbol)
+        time.sleep(0.05)
+        return {"symbol": symbol}
+
+    async def scenario():
+        return await asyncio.gather(*[executor.run(("master", "BTC"), compute, "BTC") for _ in range(10)])
+
+    results = asyncio.run(scenario())
+
+    assert calls == ["BTC"]
+    assert all(r is results[0] for r in results)
+    metrics = executor.metrics()
+    assert metrics["coalesced"] == 9
+    assert metrics["completed"] == 1
+    assert metrics["inflight_keys"] == 0
+    executor.shutdown()
+
+
+def test_pool_bounds_concurrency_and_reports_queue_depth():
+    executor = AnalysisExecutor(max_workers=1)
+    release = threading.Event()
+    snapshots = []
+
+    def compute(symbol):
+        release.wait(timeout=5)
+        return symbol
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(executor.run(("master", s), compute, s)) for s in ["BTC", "ETH", "SOL"]]
+        await asyncio.sleep(0.05)
+        snapshots.append(executor.metrics())
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(scenario()) == ["BTC", "ETH", "SOL"]
+    assert snapshots[0]["active"] == 1
+    assert snapshots[0]["queued"] == 2
+    assert snapshots[0]["inflight_keys"] == 3
+    executor.shutdown()
+
+
+def test_errors_propagate_to_every_waiter():
+    executor = AnalysisExecutor(max_workers=1)
+
+    def compute():
+        time.sleep(0.02)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*[executor.run("k", compute) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert executor.metrics()["failed"] == 1
+    executor.shutdown()
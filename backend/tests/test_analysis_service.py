@@ -70,3 +70,34 @@ def test_get_forward_premiums_vs_sample_median(mock_raw_data):
     # If we have 1 row, devs should be 0.
     if "prem270" in result.columns:
         assert result.iloc[0]["prem270"] == 0.0
+
+def test_term_structure_matches_presenter(presenter, make_raw_data):
+    df = make_raw_data()
+    buckets = AnalysisService.get_term_structure(df)
+
+    expected_days = presenter["get_days_to_expiry"](df)
+    expected_prems = presenter["get_annualized_forward_premiums"](df)
+    for col in ["t_1", "t_7", "t_30", "t_60", "t_90", "t_180", "t_270", "t_360"]:
+        np.testing.assert_array_equal(buckets[col].to_numpy(dtype=float), expected_days[col].to_numpy(dtype=float))
+    for col in ["prem1", "prem7", "prem30", "prem60", "prem90", "prem180", "prem270", "prem360"]:
+        np.testing.assert_array_equal(buckets[col].to_numpy(dtype=float), expected_prems[col].to_numpy(dtype=float))
+
+    # Deviations: presenter rounds to 2 decimals after subtracting the median
+    expected_devs = presenter["get_forward_premiums_vs_sample_median"](df)
+    devs = AnalysisService.get_forward_premiums_vs_sample_median(df, buckets=buckets)
+    for bucket in ["1", "7", "30", "60", "90", "180", "270", "360"]:
+        np.testing.assert_allclose(devs[f"dev_{bucket}"], expected_devs[f"prem{bucket}"], atol=0.005 + 1e-9)
+
+
+def test_term_structure_breaks_day_ties_in_original_order():
+    # Two expiries 6 days out: the first listed one takes the nearer rank (t_7)
+    df = pd.DataFrame({
+        "ran_at_utc": [pd.Timestamp("2023-01-01")] * 8,
+        "days_to_expiry": [6, 363, 6, 276, 88, 26, 175, 62],
+        "annualized_pct": [7.77, 7.54, 5.07, 6.19, 4.90, 10.39, 11.03, 15.28],
+    })
+    buckets = AnalysisService.get_term_structure(df)
+    row = buckets.iloc[0]
+    assert row["t_270"] == 276 and row["t_360"] == 363
+    assert row["prem7"] == 7.77
+    assert row["prem1"] == 5.07
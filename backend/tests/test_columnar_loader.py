@@ -0,0 +1,52 @@
+import io
+
+import pandas as pd
+import numpy as np
+from sqlalchemy import create_engine, text
+from src.infrastructure.database.columnar_loader import load_columns, _load_via_copy
+
+DTYPES = {"run_main_id": "int64", "spot_run": "float64", "days_to_expiry": "int64"}
+
+
+class FakeCopyCursor:
+    """Minimal psycopg2-like cursor: records the COPY statement and replays CSV."""
+
+    def __init__(self, csv: str):
+        self.csv = csv
+        self.statement = None
+
+    def mogrify(self, sql, params):
+        return (sql % {k: repr(v) for k, v in params.items()}).encode()
+
+    def copy_expert(self, statement, buffer):
+        self.statement = statement
+        buffer.write(self.csv.encode())
+
+
+def test_copy_path_parses_typed_columns():
+    cursor = FakeCopyCursor("1,100.5,30\n1,,60\n2,101.25,30\n")
+    df = _load_via_copy(cursor, "SELECT a FROM t WHERE asset = :asset AND id > :after_id;", {"asset": "BTC", "after_id": 7}, DTYPES)
+
+    assert cursor.statement == "COPY (SELECT a FROM t WHERE asset = 'BTC' AND id > 7) TO STDOUT WITH (FORMAT csv)"
+    assert df.dtypes.to_dict() == {k: np.dtype(v) for k, v in DTYPES.items()}
+    assert df["run_main_id"].tolist() == [1, 1, 2]
+    assert np.isnan(df["spot_run"].iloc[1])
+
+
+def test_copy_path_empty_result_keeps_dtypes():
+    df = _load_via_copy(FakeCopyCursor(""), "SELECT 1", {}, DTYPES)
+    assert df.empty
+    assert df.dtypes.to_dict() == {k: np.dtype(v) for k, v in DTYPES.items()}
+
+
+def test_stream_fallback_for_drivers_without_copy():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (run_main_id INTEGER, spot_run REAL, days_to_expiry INTEGER, asset TEXT)"))
+        conn.execute(text("INSERT INTO t VALUES (1, 100.5, 30, 'BTC'), (2, NULL, 60, 'BTC'), (3, 1.0, 5, 'ETH')"))
+
+    df = load_columns(engine, "SELECT run_main_id, spot_run, days_to_expiry FROM t WHERE asset = :asset ORDER BY run_main_id", {"asset": "BTC"}, DTYPES)
+
+    assert df["run_main_id"].tolist() == [1, 2]
+    assert df["days_to_expiry"].dtype == np.int64
+    assert np.isnan(df["spot_run"].iloc[1])
@@ -0,0 +1,66 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.application.services.analysis_service import AnalysisService
+from src.application.services.correlation_engine import rolling_correlations
+
+PREM_COLS = ["prem1", "prem7", "prem30", "prem60", "prem90", "prem180", "prem270", "prem360"]
+
+
+def reference_loop(merged, target_col, window, min_periods):
+    # The original per-row implementation, kept here as the ground truth
+    out = {}
+    for col in PREM_COLS:
+        corrs = [np.nan] * len(merged)
+        for i in range(len(merged)):
+            if i < min_periods - 1:
+                continue
+            start = 0 if window is None else max(0, i - window + 1)
+            data = merged.iloc[start:i + 1][[col, target_col]].dropna()
+            if len(data) >= min_periods:
+                corrs[i] = data[col].corr(data[target_col])
+        out[col] = np.array(corrs, dtype=float)
+    return out
+
+
+@pytest.mark.parametrize("target_col, presenter_fn, min_periods", [
+    ("f1", "get_cross_correlations_f1", 4),
+    ("f5", "get_cross_correlations_f5", 3),
+])
+@pytest.mark.parametrize("window", [None, 10])
+def test_parity_with_presenter(presenter, make_raw_data, target_col, presenter_fn, min_periods, window):
+    df = make_raw_data()
+    expected = presenter[presenter_fn](df, window=window, min_periods=min_periods)
+    result = AnalysisService.get_cross_correlations(df, target_col, window=window, min_periods=min_periods)
+
+    assert len(result) == len(expected)
+    for col in PREM_COLS:
+        ours = result[col].to_numpy(dtype=float)
+        theirs = expected[col].to_numpy(dtype=float)
+        assert np.array_equal(np.isnan(ours), np.isnan(theirs)), col
+        # The presenter rounds its output to 2 decimals
+        mask = ~np.isnan(ours)
+        assert np.all(np.abs(ours[mask] - theirs[mask]) <= 0.005 + 1e-9), col
+
+
+@pytest.mark.parametrize("window", [None, 5, 12])
+@pytest.mark.parametrize("min_periods", [2, 3, 4])
+def test_matches_original_loop(make_raw_data, window, min_periods):
+    df = make_raw_data(n_runs=40, seed=11)
+    premiums = AnalysisService.get_annualized_forward_premiums(df)
+    changes = AnalysisService.get_forward_price_changes(df)
+    merged = premiums.merge(changes, on="ran_at_utc", how="inner").sort_values("ran_at_utc").reset_index(drop=True)
+
+    expected = reference_loop(merged, "f5", window, min_periods)
+    result = AnalysisService.get_cross_correlations(df, "f5", window=window, min_periods=min_periods)
+
+    for col in PREM_COLS:
+        np.testing.assert_allclose(result[col].to_numpy(dtype=float), expected[col], rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_constant_slice_is_undefined():
+    x = np.array([[5.0], [5.0], [5.0], [5.0], [1.0]])
+    y = np.array([0.1, 0.3, 0.2, 0.4, 0.5])
+    corrs = rolling_correlations(x, y, window=4, min_periods=3)
+    assert np.isnan(corrs[:4, 0]).all()
+    assert not np.isnan(corrs[4, 0])
@@ -0,0 +1,39 @@
+from src.scrapers.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_burst_then_sustained_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=5, clock=clock, sleep=clock.sleep)
+
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.now == 0.0
+
+    for _ in range(10):
+        bucket.acquire()
+    # 10 more requests at 10/s after the burst is spent
+    assert abs(clock.now - 1.0) < 1e-9
+
+
+def test_pause_blocks_until_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=10, clock=clock, sleep=clock.sleep)
+
+    bucket.pause(3.0)
+    bucket.acquire()
+
+    # Waits out the pause, then one token's worth of refill
+    assert abs(clock.now - 3.1) < 1e-9